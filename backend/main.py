@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import clustering, scraping
+from routes import clustering, engagement, pipeline, scraping
 
 app = FastAPI(
     title="SNUC Club Analysis Backend",
@@ -28,6 +28,8 @@ app.add_middleware(
 # Include the routers
 app.include_router(clustering.router)
 app.include_router(scraping.router)
+app.include_router(engagement.router)
+app.include_router(pipeline.router)
 
 @app.get("/")
 def read_root():
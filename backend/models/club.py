@@ -4,6 +4,8 @@ from typing import List, Dict, Optional
 class ClubBase(BaseModel):
     name: str
     description: str
+    # Name of the club's WhatsApp export (whatsapp/<chat>.txt) when it differs from `name`
+    chat: Optional[str] = None
 
 class ClubDataInput(BaseModel):
     clubs: List[ClubBase]
@@ -21,4 +23,25 @@ class RankedCluster(BaseModel):
 
 class RankedClusteringResult(BaseModel):
     clusters: List[RankedCluster]
-    outliers: List[str]
\ No newline at end of file
+    outliers: List[str]
+
+# Models for sweeping clustering thresholds
+class ThresholdSweepInput(BaseModel):
+    clubs: List[ClubBase]
+    # Distance thresholds to evaluate; defaults to every merge height of the dendrogram
+    thresholds: Optional[List[float]] = None
+
+class ThresholdResult(BaseModel):
+    # Clubs are grouped by every merge at cosine distance <= threshold
+    threshold: float
+    num_clusters: int
+    cluster_sizes: List[int]
+    outlier_count: int
+    # Mean silhouette over all clubs (cosine); None when there are fewer than 2 or as many groups as clubs
+    silhouette: Optional[float]
+    clusters: Dict[int, List[str]]
+    outliers: List[str]
+
+class ThresholdSweepResult(BaseModel):
+    default_threshold: float
+    results: List[ThresholdResult]
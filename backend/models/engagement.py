@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+class ClubEngagement(BaseModel):
+    name: str
+    # Message totals inside the window (decay-weighted when a half-life is set)
+    whatsapp_messages: float
+    emails: float
+    # Weighted sum of the min-max normalised WhatsApp and email totals
+    total_engagement_score: float
+
+class EngagementWindow(BaseModel):
+    start: date
+    end: date
+    clubs: List[ClubEngagement]
+
+class EngagementResult(BaseModel):
+    period: Optional[str] = None
+    half_life_days: Optional[float] = None
+    windows: List[EngagementWindow]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class StageReport(BaseModel):
+    name: str
+    # "ran", "skipped" (outputs up to date), "stale" (an always-run stage failed but its
+    # previous outputs were kept), "failed" or "blocked" (an upstream stage failed)
+    status: str
+    seconds: float
+    detail: Optional[str] = None
+
+class PipelineReport(BaseModel):
+    stages: List[StageReport]
+    total_seconds: float
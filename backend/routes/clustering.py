@@ -1,6 +1,7 @@
-from fastapi import APIRouter
-from models.club import ClubDataInput, RankedClusteringResult # Updated model
-from services.clustering_service import run_clustering_and_ranking # Updated service function
+from fastapi import APIRouter, HTTPException
+from models.club import ClubDataInput, RankedClusteringResult, ThresholdSweepInput, ThresholdSweepResult # Updated model
+from routes.streaming import StreamMode, stream_events
+from services.clustering_service import run_clustering_and_ranking, iter_clustering_and_ranking, sweep_clustering_thresholds # Updated service function
 
 router = APIRouter(
     prefix="/clustering",
@@ -8,9 +9,25 @@ router = APIRouter(
 )
 
 @router.post("/group-clubs", response_model=RankedClusteringResult) # Updated response model
-def group_clubs_endpoint(club_data: ClubDataInput):
+def group_clubs_endpoint(club_data: ClubDataInput, stream: StreamMode = None):
     """
     Accepts a list of club names and descriptions, groups them by similarity,
     and ranks the clubs within each group based on a combined engagement score.
+    With `?stream=ndjson` or `?stream=sse`, a progress event is sent as each stage
+    starts, followed by the result.
     """
-    return run_clustering_and_ranking(club_data)
\ No newline at end of file
+    if stream:
+        return stream_events(iter_clustering_and_ranking(club_data), stream)
+    return run_clustering_and_ranking(club_data)
+
+@router.post("/threshold-sweep", response_model=ThresholdSweepResult)
+def threshold_sweep_endpoint(sweep_input: ThresholdSweepInput):
+    """
+    Builds the clustering dendrogram once and returns the groups, silhouette score,
+    cluster sizes and outlier count for each requested distance threshold
+    (or every merge height when none are given).
+    """
+    try:
+        return sweep_clustering_thresholds(sweep_input)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
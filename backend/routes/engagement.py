@@ -0,0 +1,37 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from models.engagement import EngagementResult
+from services.engagement_service import get_engagement_engine
+
+router = APIRouter(
+    prefix="/engagement",
+    tags=["Engagement"],
+)
+
+@router.get("", response_model=EngagementResult, summary="Windowed Engagement Scores")
+def engagement_endpoint(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    period: Optional[Literal["month", "semester"]] = None,
+    half_life_days: Optional[float] = Query(None, gt=0),
+    whatsapp_weight: float = 0.6,
+    email_weight: float = 0.4,
+):
+    """
+    Scores club engagement from WhatsApp and email activity between `start` and `end`
+    (defaulting to the full data range). With `period`, returns one ranking per calendar
+    month or semester. With `half_life_days`, older messages in each window count
+    exponentially less.
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end.")
+    try:
+        engine = get_engagement_engine()
+        return engine.query(start, end, period, half_life_days, whatsapp_weight, email_weight)
+    except ValueError as e:
+        # e.g. a start after the last day of data with the default end
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from models.pipeline import PipelineReport
+from services import pipeline_service
+
+router = APIRouter(
+    prefix="/pipeline",
+    tags=["Pipeline"],
+)
+
+@router.get("/stages", summary="List Pipeline Stages")
+def list_stages_endpoint():
+    """Returns each pipeline stage with its declared inputs, outputs, dependencies and whether it always runs."""
+    return [
+        {"name": stage.name, "inputs": stage.inputs, "outputs": stage.outputs, "deps": list(stage.deps), "always_run": stage.always_run}
+        for stage in pipeline_service.STAGES
+    ]
+
+@router.post("/run", response_model=PipelineReport, summary="Run the Analysis Pipeline")
+def run_pipeline_endpoint(force: bool = False, stages: Optional[List[str]] = Query(None)):
+    """
+    Runs the scraping, analysis and clustering stages in dependency order, skipping
+    stages whose outputs are current and running independent stages in parallel.
+    Returns the status and wall time of each stage.
+    """
+    try:
+        return pipeline_service.run_pipeline(force=force, only=stages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
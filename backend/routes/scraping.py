@@ -1,4 +1,7 @@
+import itertools
+
 from fastapi import APIRouter, HTTPException
+from routes.streaming import StreamMode, stream_events
 from services import scraping_service
 
 router = APIRouter(
@@ -32,12 +35,19 @@ def scrape_instagram_endpoint(username: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/whatsapp", summary="Trigger WhatsApp Chat Analysis")
-def analyze_whatsapp_endpoint():
+def analyze_whatsapp_endpoint(stream: StreamMode = None):
     """
     Triggers the analysis of all WhatsApp chat logs in the `whatsapp` directory.
     Returns the analysis results as JSON.
+    With `?stream=ndjson` or `?stream=sse`, each club's metrics are sent as soon as
+    its chat has been analysed.
     """
     try:
+        if stream:
+            events = scraping_service.iter_whatsapp_analysis()
+            # Pull the first event eagerly so setup errors still produce an HTTP error.
+            first = next(events)
+            return stream_events(itertools.chain([first], events), stream)
         analysis_results = scraping_service.analyze_whatsapp_chats()
         return analysis_results
     except Exception as e:
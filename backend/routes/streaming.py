@@ -0,0 +1,44 @@
+import json
+from typing import Iterable, Literal, Optional
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+StreamMode = Optional[Literal["ndjson", "sse"]]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode(event):
+    return json.dumps(event, default=lambda o: o.model_dump(mode="json") if isinstance(o, BaseModel) else float(o))
+
+
+def _format(event, mode):
+    if mode == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {_encode(event)}\n\n"
+    return _encode(event) + "\n"
+
+
+def _serialize(events, mode):
+    # Errors after the response has started can no longer become an HTTP status,
+    # so they are sent as a final `error` event instead.
+    try:
+        for event in events:
+            yield _format(event, mode)
+    except Exception as e:
+        yield _format({"event": "error", "detail": str(e)}, mode)
+
+
+def stream_events(events: Iterable[dict], mode: Literal["ndjson", "sse"]) -> StreamingResponse:
+    """
+    Wraps an iterator of event dicts (each with an `event` key) in a streaming
+    response, one event per NDJSON line or Server-Sent Event.
+    """
+    return StreamingResponse(
+        _serialize(events, mode),
+        media_type=MEDIA_TYPES[mode],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
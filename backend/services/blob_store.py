@@ -0,0 +1,66 @@
+import os
+import hashlib
+import tempfile
+
+# --- Content-Addressed Blob Store ---
+# Mail attachments and inline images are written here keyed by their SHA-256,
+# so a poster embedded in ten announcements is only stored once on disk.
+
+DEFAULT_BLOB_DIR = "mail_blobs"
+
+
+class BlobWriter:
+    """
+    Write handle for a single blob. Bytes are hashed and written to a temporary
+    file as they arrive; `commit()` moves the file to its content address.
+    """
+
+    def __init__(self, store, extension=""):
+        self.store = store
+        self.extension = extension
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        if data:
+            self._hash.update(data)
+            self._file.write(data)
+            self.size += len(data)
+
+    def commit(self):
+        """
+        Finalises the blob and returns its reference. If a blob with the same
+        hash already exists the temporary copy is discarded.
+        """
+        self._file.close()
+        digest = self._hash.hexdigest()
+        final_path = self.store.path_for(digest, self.extension)
+        if os.path.exists(final_path):
+            os.remove(self._tmp_path)
+            is_new = False
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(self._tmp_path, final_path)
+            is_new = True
+        return {"sha256": digest, "size": self.size, "path": final_path, "new": is_new}
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class BlobStore:
+    def __init__(self, root=DEFAULT_BLOB_DIR):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, digest, extension=""):
+        # Two-character fan-out keeps directory listings small.
+        return os.path.join(self.root, digest[:2], f"{digest}{extension}")
+
+    def open_writer(self, extension=""):
+        return BlobWriter(self, extension)
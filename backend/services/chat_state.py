@@ -0,0 +1,230 @@
+import io
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+
+from services.chat_store import ChatArrays, load_chat_arrays
+
+# --- Incremental Chat Metric State ---
+# WhatsApp exports are re-exported periodically and are normally the previous
+# file with new messages appended. For each chat we persist the aggregates the
+# CEI metrics are built from, together with the number of bytes they cover and
+# a hash of those bytes. On the next run only the appended tail is parsed and
+# merged in; if the covered prefix has changed the chat is parsed from scratch.
+# Both the CEI analysis and the engagement engine read chats through this
+# module, so the state file is the only per-chat cache they depend on.
+
+STATE_VERSION = 1
+_HASH_CHUNK = 1 << 20
+
+
+class ChatMetricState:
+    """
+    Mergeable aggregates for one chat. Merging the state of a prefix with the
+    state of the messages that follow it gives the state of the whole chat.
+    """
+
+    def __init__(self):
+        self.messages = 0
+        self.daily = {}    # day number -> messages
+        self.weekly = {}   # Monday-based week number -> messages
+        self.users = {}    # user -> messages
+        self.delay_sum = 0.0
+        self.delay_count = 0
+        self.first_user = None
+        self.first_ts = None
+        self.last_user = None
+        self.last_ts = None
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        state = cls()
+        if not len(arrays):
+            return state
+        order = np.argsort(arrays.timestamps, kind="stable")
+        ts, codes = arrays.timestamps[order], arrays.user_codes[order]
+
+        days = ts // 86400
+        for day, count in zip(*np.unique(days, return_counts=True)):
+            state.daily[int(day)] = int(count)
+        # The epoch was a Thursday, so (day + 3) // 7 groups Monday-Sunday weeks.
+        for week, count in zip(*np.unique((days + 3) // 7, return_counts=True)):
+            state.weekly[int(week)] = int(count)
+        for code, count in enumerate(np.bincount(codes)):
+            if count:
+                state.users[arrays.users[code]] = int(count)
+
+        delays = np.diff(ts)[codes[1:] != codes[:-1]] / 60
+        delays = delays[(delays > 0) & (delays < 180)]
+        state.delay_sum = float(delays.sum())
+        state.delay_count = int(len(delays))
+
+        state.messages = int(len(ts))
+        state.first_user, state.first_ts = arrays.users[codes[0]], int(ts[0])
+        state.last_user, state.last_ts = arrays.users[codes[-1]], int(ts[-1])
+        return state
+
+    def merge(self, later):
+        """Folds in the state of messages that come after this one's."""
+        if not later.messages:
+            return self
+        if not self.messages:
+            return later
+        merged = ChatMetricState()
+        merged.messages = self.messages + later.messages
+        for field in ("daily", "weekly", "users"):
+            combined = dict(getattr(self, field))
+            for key, count in getattr(later, field).items():
+                combined[key] = combined.get(key, 0) + count
+            setattr(merged, field, combined)
+        merged.delay_sum = self.delay_sum + later.delay_sum
+        merged.delay_count = self.delay_count + later.delay_count
+        # The reply delay across the join is the only one neither side has seen.
+        if later.first_user != self.last_user:
+            delta = (later.first_ts - self.last_ts) / 60
+            if 0 < delta < 180:
+                merged.delay_sum += delta
+                merged.delay_count += 1
+        merged.first_user, merged.first_ts = self.first_user, self.first_ts
+        merged.last_user, merged.last_ts = later.last_user, later.last_ts
+        return merged
+
+    def metrics(self):
+        """Returns (activity, participation, responsiveness, sustainability)."""
+        activity = self.messages / len(self.daily)
+
+        user_counts = np.array(list(self.users.values()), dtype=float)
+        probs = user_counts / user_counts.sum()
+        entropy = -(probs * np.log2(probs)).sum()
+        max_entropy = np.log2(len(user_counts)) if len(user_counts) > 1 else 1
+        participation = entropy / max_entropy if max_entropy > 0 else 0
+
+        responsiveness = 1 / (1 + self.delay_sum / self.delay_count) if self.delay_count else 0.5
+
+        # Empty weeks between the first and last active week count as zero.
+        first_week = min(self.weekly)
+        weekly = np.zeros(max(self.weekly) - first_week + 1)
+        for week, count in self.weekly.items():
+            weekly[week - first_week] = count
+        sustainability = 1 / (1 + weekly.std(ddof=1)) if len(weekly) > 1 else 1
+
+        return activity, participation, responsiveness, sustainability
+
+    def to_dict(self):
+        return {
+            "messages": self.messages,
+            # JSON object keys must be strings.
+            "daily": {str(k): v for k, v in self.daily.items()},
+            "weekly": {str(k): v for k, v in self.weekly.items()},
+            "users": self.users,
+            "delay_sum": self.delay_sum,
+            "delay_count": self.delay_count,
+            "first_user": self.first_user,
+            "first_ts": self.first_ts,
+            "last_user": self.last_user,
+            "last_ts": self.last_ts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.messages = data["messages"]
+        state.daily = {int(k): v for k, v in data["daily"].items()}
+        state.weekly = {int(k): v for k, v in data["weekly"].items()}
+        state.users = data["users"]
+        state.delay_sum = data["delay_sum"]
+        state.delay_count = data["delay_count"]
+        state.first_user, state.first_ts = data["first_user"], data["first_ts"]
+        state.last_user, state.last_ts = data["last_user"], data["last_ts"]
+        return state
+
+
+def state_path_for(chat_file_path):
+    return os.path.splitext(chat_file_path)[0] + ".state.json"
+
+
+def _parse_tail(data):
+    # Imported here to avoid a cycle: scraping_service analyses chats through this module.
+    from services.scraping_service import parse_chat_lines
+
+    # Decoded exactly like parse_chat_file's text-mode open (strict UTF-8, universal newlines).
+    rows = parse_chat_lines(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"))
+    return ChatMetricState.from_arrays(ChatArrays.from_rows(rows))
+
+
+def _hash_prefix(f, length):
+    """Returns a sha256 object fed with the first `length` bytes of the file."""
+    digest = hashlib.sha256()
+    f.seek(0)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(_HASH_CHUNK, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest
+
+
+def _read_saved(chat_file_path):
+    path = state_path_for(chat_file_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("version") != STATE_VERSION:
+            return None
+        return saved["offset"], saved["prefix_sha256"], ChatMetricState.from_dict(saved["state"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save(chat_file_path, offset, prefix_sha256, state):
+    # Temporary file + rename, so a concurrent reader never sees half a state file.
+    path = state_path_for(chat_file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".state.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "offset": offset, "prefix_sha256": prefix_sha256, "state": state.to_dict()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_chat_state(chat_file_path):
+    """
+    Returns the up-to-date ChatMetricState for a chat export, parsing only the
+    bytes appended since the last run when the previously seen prefix is unchanged.
+    """
+    saved = _read_saved(chat_file_path)
+    with open(chat_file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if saved is not None:
+            offset, prefix_sha256, state = saved
+            digest = _hash_prefix(f, offset) if offset <= size else None
+            if digest is not None and digest.hexdigest() == prefix_sha256:
+                if offset == size:
+                    return state
+                tail = f.read()  # the prefix hash left the file positioned at `offset`
+                print(f"Parsing {len(tail)} appended bytes of {os.path.basename(chat_file_path)}...")
+                state = state.merge(_parse_tail(tail))
+                digest.update(tail)
+                _save(chat_file_path, offset + len(tail), digest.hexdigest(), state)
+                return state
+            print(f"{os.path.basename(chat_file_path)} changed before the last analysed byte; re-parsing it fully.")
+
+        f.seek(0)
+        digest = _hash_prefix(f, size)
+    # The export has changed, so its .npz stamp is stale too; parse without writing one.
+    state = ChatMetricState.from_arrays(load_chat_arrays(chat_file_path, use_cache=False))
+    if os.path.getsize(chat_file_path) != size:
+        # The export grew while it was being parsed; start over so offset and state agree.
+        return load_chat_state(chat_file_path)
+    _save(chat_file_path, size, digest.hexdigest(), state)
+    return state
@@ -0,0 +1,113 @@
+import os
+import zipfile
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+# --- Compact Chat Message Store ---
+# A parsed chat is kept as three parallel arrays instead of a DataFrame of
+# [datetime, user, message] objects:
+#   timestamps  int64  seconds since the epoch (chat-local time, no timezone)
+#   user_codes  int32  index into `users`
+#   lengths     int32  message length in characters (the body itself is dropped)
+# The arrays can be cached as `<chat>.npz` next to each export, so callers that
+# need per-message data read a few kilobytes of binary data instead of re-running
+# the line regexes. CEI and engagement scoring do not use this cache; they read
+# the aggregated, append-aware state in services/chat_state.py.
+
+CACHE_VERSION = 1
+_EPOCH = datetime(1970, 1, 1)
+
+
+class ChatArrays:
+    def __init__(self, timestamps, user_codes, users, lengths):
+        self.timestamps = timestamps
+        self.user_codes = user_codes
+        self.users = users
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def days(self):
+        """Day number (days since the epoch) of each message."""
+        return self.timestamps // 86400
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds the arrays from parse_chat_file rows, interning user names."""
+        codes = {}
+        timestamps = np.empty(len(rows), dtype=np.int64)
+        user_codes = np.empty(len(rows), dtype=np.int32)
+        lengths = np.empty(len(rows), dtype=np.int32)
+        for i, (dt, user, msg) in enumerate(rows):
+            timestamps[i] = int((dt - _EPOCH).total_seconds())
+            user_codes[i] = codes.setdefault(user, len(codes))
+            lengths[i] = len(msg)
+        return cls(timestamps, user_codes, list(codes), lengths)
+
+
+def cache_path_for(chat_file_path):
+    return os.path.splitext(chat_file_path)[0] + ".npz"
+
+
+def _source_stamp(chat_file_path):
+    stat = os.stat(chat_file_path)
+    return np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def save_chat_arrays(chat_file_path, arrays):
+    # Written to a temporary file and renamed into place, so a reader running
+    # at the same time (pipeline vs. API) never sees a partial archive.
+    cache_path = cache_path_for(chat_file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                stamp=_source_stamp(chat_file_path),
+                timestamps=arrays.timestamps,
+                user_codes=arrays.user_codes,
+                users=np.array(arrays.users, dtype=str),
+                lengths=arrays.lengths,
+            )
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_cache(chat_file_path):
+    cache_path = cache_path_for(chat_file_path)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if not np.array_equal(data["stamp"], _source_stamp(chat_file_path)):
+                return None
+            return ChatArrays(data["timestamps"], data["user_codes"], data["users"].tolist(), data["lengths"])
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        # A truncated or corrupt cache is treated as missing and rebuilt.
+        return None
+
+
+def load_chat_arrays(chat_file_path, use_cache=True):
+    """
+    Returns the ChatArrays for a chat export, from the .npz cache when it matches
+    the export's size and modification time, otherwise by parsing the text and
+    refreshing the cache.
+    """
+    # Imported here to avoid a cycle: scraping_service analyses chats through this module.
+    from services.scraping_service import parse_chat_file
+
+    if use_cache:
+        cached = _read_cache(chat_file_path)
+        if cached is not None:
+            return cached
+    arrays = ChatArrays.from_rows(parse_chat_file(chat_file_path))
+    if use_cache:
+        save_chat_arrays(chat_file_path, arrays)
+    return arrays
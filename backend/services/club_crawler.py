@@ -0,0 +1,222 @@
+import os
+import json
+import hashlib
+import urllib.parse
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.club import ClubDataInput, ClubBase
+
+# --- Club Website Crawler ---
+# Fetches the clubs index page and any per-club pages it links to, concurrently
+# over a pooled session. Responses are cached on disk with their ETag and
+# Last-Modified headers and revalidated with conditional requests, so an
+# unchanged site costs one 304 per page. Club name/description pairs are pulled
+# out with a streaming HTMLParser rather than a full BeautifulSoup tree.
+
+CLUBS_INDEX_URL = "https://www.snuchennai.edu.in/clubs/"
+# The site is fetched through scrape.do; both utils/webscrapper.py and the
+# pipeline use this default. Pass proxy_template=None to fetch directly.
+PROXY_TEMPLATE = "http://api.scrape.do/?url={url}&token=73f7c02b36694c8795b7ff0aea5d40b5919ed68fb46"
+PAGE_CACHE_DIR = "page_cache"
+PLACEHOLDER_TEXT = "Will Be Updated Soon…"
+
+
+class _ClubPageParser(HTMLParser):
+    """
+    Collects one club per Elementor tab pane: the first <h2> is the club name and
+    the first text-editor widget is its description. Pages without tab panes
+    (e.g. a club's own page) are treated as a single pane. Also records links.
+    """
+
+    def __init__(self, panes_only):
+        super().__init__(convert_charrefs=True)
+        self.panes_only = panes_only
+        self.clubs = []
+        self.links = []
+        self._div_depth = 0
+        self._pane_depth = None
+        self._current = {"name": "", "description": ""}
+        self._capture = None          # "name" or "description" while inside the element
+        self._capture_depth = None
+        self._buffer = []
+        self._skip = 0                # inside <style>/<script>
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag in ("style", "script"):
+            self._skip += 1
+        elif tag == "a" and attrs.get("href"):
+            self.links.append(attrs["href"])
+        elif tag == "div":
+            self._div_depth += 1
+            if "elementkit-tab-pane" in classes:
+                self._finish_club()
+                self._pane_depth = self._div_depth
+            elif "elementor-widget-text-editor" in classes and self._can_capture("description"):
+                self._start_capture("description")
+        elif tag == "h2" and self._can_capture("name"):
+            self._start_capture("name")
+
+    def handle_endtag(self, tag):
+        if tag in ("style", "script"):
+            self._skip = max(self._skip - 1, 0)
+        elif tag == "h2" and self._capture == "name":
+            self._end_capture()
+        elif tag == "div":
+            if self._capture == "description" and self._div_depth == self._capture_depth:
+                self._end_capture()
+            if self._pane_depth is not None and self._div_depth == self._pane_depth:
+                self._finish_club()
+                self._pane_depth = None
+            self._div_depth -= 1
+
+    def handle_data(self, data):
+        if self._capture and not self._skip:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._finish_club()
+
+    def _can_capture(self, field):
+        in_scope = self._pane_depth is not None or not self.panes_only
+        return in_scope and self._capture is None and not self._current[field]
+
+    def _start_capture(self, field):
+        self._capture = field
+        self._capture_depth = self._div_depth
+        self._buffer = []
+
+    def _end_capture(self):
+        text = " ".join(" ".join(self._buffer).split())
+        if self._capture == "name" or text != PLACEHOLDER_TEXT:
+            self._current[self._capture] = text
+        self._capture = None
+
+    def _finish_club(self):
+        if self._current["name"] and self._current["description"]:
+            self.clubs.append(dict(self._current))
+        self._current = {"name": "", "description": ""}
+
+
+def extract_clubs(html):
+    """Returns ([{"name", "description"}, ...], links) from one page of HTML."""
+    parser = _ClubPageParser(panes_only="elementkit-tab-pane" in html)
+    parser.feed(html)
+    parser.close()
+    return parser.clubs, parser.links
+
+
+class ClubCrawler:
+    def __init__(self, index_url=CLUBS_INDEX_URL, cache_dir=PAGE_CACHE_DIR, max_workers=8, proxy_template=PROXY_TEMPLATE, timeout=30):
+        """
+        `proxy_template`, if given, is a format string with a `{url}` placeholder
+        (e.g. a scraping proxy endpoint); the page URL is quoted into it.
+        """
+        self.index_url = index_url
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.proxy_template = proxy_template
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"fetched": 0, "revalidated": 0}
+
+    # --- Disk cache ---
+
+    def _cache_paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.html"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def fetch(self, url):
+        """Returns the page body, revalidating any cached copy with a conditional GET."""
+        body_path, meta_path = self._cache_paths(url)
+        headers = {}
+        meta = None
+        if os.path.exists(body_path) and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        request_url = self.proxy_template.format(url=urllib.parse.quote(url)) if self.proxy_template else url
+        response = self.session.get(request_url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and meta is not None:
+            self.stats["revalidated"] += 1
+            with open(body_path, "r", encoding="utf-8") as f:
+                return f.read()
+        response.raise_for_status()
+        if "charset" not in response.headers.get("Content-Type", ""):
+            response.encoding = "utf-8"
+
+        self.stats["fetched"] += 1
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}, f)
+        return response.text
+
+    # --- Crawl ---
+
+    def _detail_links(self, links):
+        """Links to pages below the index URL, e.g. /clubs/<club>/."""
+        index = urllib.parse.urlsplit(self.index_url)
+        found = []
+        for href in links:
+            url = urllib.parse.urldefrag(urllib.parse.urljoin(self.index_url, href))[0]
+            parts = urllib.parse.urlsplit(url)
+            if parts.netloc == index.netloc and parts.path.startswith(index.path) and parts.path.rstrip("/") != index.path.rstrip("/"):
+                if url not in found:
+                    found.append(url)
+        return found
+
+    def crawl(self) -> ClubDataInput:
+        print(f"Fetching club index {self.index_url}...")
+        clubs, links = extract_clubs(self.fetch(self.index_url))
+        detail_urls = self._detail_links(links)
+
+        if detail_urls:
+            print(f"Fetching {len(detail_urls)} club pages with {self.max_workers} workers...")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                pages = list(pool.map(self.fetch, detail_urls))
+            for html in pages:
+                clubs.extend(extract_clubs(html)[0])
+
+        # The index repeats every club (desktop and mobile layouts); keep the most
+        # detailed description seen for each name, in first-seen order.
+        merged = {}
+        for club in clubs:
+            if club["name"] not in merged or len(club["description"]) > len(merged[club["name"]]):
+                merged[club["name"]] = club["description"]
+        print(f"Crawl complete: {len(merged)} clubs ({self.stats['fetched']} pages fetched, {self.stats['revalidated']} unchanged).")
+        return ClubDataInput(clubs=[ClubBase(name=name, description=desc) for name, desc in merged.items()])
+
+
+def save_club_data(club_data: ClubDataInput, json_path="clubs.json", paragraphs_path="clubs_paragraphs.txt"):
+    """
+    Writes the crawl as ClubDataInput JSON plus the legacy one-description-per-line file.
+    The hand-maintained `chat` of each club already in `json_path` is carried over by name.
+    """
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            chats = {club["name"]: club["chat"] for club in json.load(f)["clubs"] if club.get("chat")}
+    except (FileNotFoundError, ValueError, KeyError):
+        chats = {}
+    for club in club_data.clubs:
+        club.chat = club.chat or chats.get(club.name)
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(club_data.model_dump(exclude_none=True), f, ensure_ascii=False, indent=2)
+    with open(paragraphs_path, "w", encoding="utf-8") as f:
+        for club in club_data.clubs:
+            f.write(club.description + "\n")
@@ -2,12 +2,55 @@ import pandas as pd
 import numpy as np
 import os
 
-from models.club import ClubDataInput, RankedClusteringResult, RankedCluster, RankedClub
+from models.club import ClubDataInput, RankedClusteringResult, RankedCluster, RankedClub, ThresholdSweepInput, ThresholdSweepResult
+from services import email_parser
 from utils.clubGrouper import AdvancedClubGrouper
 
-def get_total_engagement_scores():
+# The grouper is kept between requests so the sentence model, embeddings and
+# dendrograms are reused when the same clubs are clustered again.
+_grouper = None
+
+def _get_grouper():
+    global _grouper
+    if _grouper is None:
+        _grouper = AdvancedClubGrouper()
+    return _grouper
+
+def _load_email_headers():
+    """
+    Loads Subject/Sender/Date for every email. Reads the .eml headers directly
+    (no body decoding) when the mails folder is present, otherwise falls back
+    to the scraped CSV. The near-duplicate cluster of each email is taken from
+    the CSV when it has been tagged; emails without one are their own cluster.
+    """
+    tagged = None
+    if os.path.exists("2024_full_mails.csv"):
+        columns = pd.read_csv("2024_full_mails.csv", nrows=0).columns
+        if {'File', 'DuplicateCluster'} <= set(columns):
+            tagged = pd.read_csv("2024_full_mails.csv", usecols=['Subject', 'Sender', 'Date', 'File', 'DuplicateCluster'])
+
+    if os.path.isdir("mails"):
+        emails_df = pd.DataFrame(email_parser.scan_email_headers("mails"), columns=['Subject', 'Sender', 'Date', 'File'])
+        if tagged is not None:
+            emails_df = emails_df.merge(tagged[['File', 'DuplicateCluster']], on='File', how='left')
+    elif tagged is not None:
+        emails_df = tagged
+    else:
+        emails_df = pd.read_csv("2024_full_mails.csv", usecols=['Subject', 'Sender', 'Date'])
+
+    if 'DuplicateCluster' not in emails_df.columns:
+        emails_df['DuplicateCluster'] = np.nan
+    # Untagged emails get a cluster of their own, keyed by row so they never collide with tagged ids.
+    untagged = emails_df['DuplicateCluster'].isna()
+    emails_df['DuplicateCluster'] = emails_df['DuplicateCluster'].astype(object)
+    emails_df.loc[untagged, 'DuplicateCluster'] = [f"row-{i}" for i in emails_df.index[untagged]]
+    return emails_df
+
+def get_total_engagement_scores(unique_announcements=True):
     """
     Generates a total engagement score for each club by combining WhatsApp and Email activity.
+    With `unique_announcements`, near-duplicate emails (forwards, reminders, repeated
+    blasts) count once per club instead of once per message.
     """
     print("Calculating total engagement scores...")
     # --- 1. Load WhatsApp Data ---
@@ -19,7 +62,7 @@ def get_total_engagement_scores():
 
     # --- 2. Load and Process Email Data ---
     try:
-        emails_df = pd.read_csv("2024_full_mails.csv")
+        emails_df = _load_email_headers()
         # Create a list of all known club names to check against
         # We get this from the whatsapp analysis file, as it's our primary source of club names
         all_club_names = whatsapp_df['Club'].unique()
@@ -29,14 +72,15 @@ def get_total_engagement_scores():
             # Count emails where the sender contains the club name (case-insensitive)
             # This is a simple heuristic for attributing emails to clubs.
             try:
-                count = emails_df[emails_df['Sender'].str.contains(club_name, case=False, na=False)].shape[0]
+                club_emails = emails_df[emails_df['Sender'].str.contains(club_name, case=False, na=False)]
+                count = club_emails['DuplicateCluster'].nunique() if unique_announcements else club_emails.shape[0]
                 email_counts[club_name] = count
             except Exception:
                 email_counts[club_name] = 0 # Fallback if search fails
         email_df = pd.DataFrame(list(email_counts.items()), columns=['Club', 'EmailCount'])
 
     except FileNotFoundError:
-        print("Warning: 2024_full_mails.csv not found. Skipping email scores.")
+        print("Warning: neither mails/ nor 2024_full_mails.csv found. Skipping email scores.")
         email_df = pd.DataFrame(columns=['Club', 'EmailCount'])
 
     # --- 3. Merge Data ---
@@ -66,23 +110,42 @@ def get_total_engagement_scores():
     return pd.Series(merged_df.total_score.values, index=merged_df.Club).to_dict()
 
 
-def run_clustering_and_ranking(club_data: ClubDataInput) -> RankedClusteringResult:
+def _engagement_score_for(club, engagement_scores):
     """
-    Takes club data, runs clustering, then ranks the clubs within each cluster.
+    Engagement scores are keyed by WhatsApp export name; a club's `chat` field
+    names its export when that differs from the club name. Matching is exact
+    apart from case.
+    """
+    by_key = {key.lower(): score for key, score in engagement_scores.items()}
+    return by_key.get((club.chat or club.name).lower(), 0)
+
+
+def iter_clustering_and_ranking(club_data: ClubDataInput):
+    """
+    Generator version of `run_clustering_and_ranking` for streaming responses.
+    Yields a `progress` event per stage and a final `result` event.
     """
     # --- Step 1: Perform Clustering ---
+    yield {"event": "progress", "stage": "loading_model"}
     club_list_for_grouper = [club.model_dump() for club in club_data.clubs]
-    grouper = AdvancedClubGrouper()
-    grouped_clubs, outlier_clubs = grouper.group_clubs(club_list_for_grouper)
+    grouper = _get_grouper()
+    for kind, payload in grouper.iter_group_clubs(club_list_for_grouper):
+        if kind == "stage":
+            yield {"event": "progress", "stage": payload}
+        else:
+            grouped_clubs, outlier_clubs = payload
 
     # --- Step 2: Get Engagement Scores ---
+    yield {"event": "progress", "stage": "scoring"}
     engagement_scores = get_total_engagement_scores()
 
     # --- Step 3: Rank clubs within each cluster ---
+    yield {"event": "progress", "stage": "ranking"}
+    clubs_by_name = {club.name: club for club in club_data.clubs}
     ranked_clusters = []
     for cluster_id, club_names in grouped_clubs.items():
         # Create a list of tuples (club_name, score)
-        club_scores = [(name, engagement_scores.get(name, 0)) for name in club_names]
+        club_scores = [(name, _engagement_score_for(clubs_by_name[name], engagement_scores)) for name in club_names]
         
         # Sort by score in descending order
         club_scores.sort(key=lambda x: x[1], reverse=True)
@@ -95,4 +158,25 @@ def run_clustering_and_ranking(club_data: ClubDataInput) -> RankedClusteringResu
         
         ranked_clusters.append(RankedCluster(cluster_id=cluster_id, clubs=ranked_clubs_list))
 
-    return RankedClusteringResult(clusters=ranked_clusters, outliers=outlier_clubs)
\ No newline at end of file
+    yield {"event": "result", "data": RankedClusteringResult(clusters=ranked_clusters, outliers=outlier_clubs)}
+
+
+def run_clustering_and_ranking(club_data: ClubDataInput) -> RankedClusteringResult:
+    """
+    Takes club data, runs clustering, then ranks the clubs within each cluster.
+    """
+    for event in iter_clustering_and_ranking(club_data):
+        if event["event"] == "result":
+            return event["data"]
+
+
+def sweep_clustering_thresholds(sweep_input: ThresholdSweepInput) -> ThresholdSweepResult:
+    """
+    Evaluates many distance thresholds against a single cached dendrogram and
+    returns the groups and quality scores for each.
+    """
+    club_list_for_grouper = [club.model_dump() for club in sweep_input.clubs]
+    if len(club_list_for_grouper) < 2:
+        raise ValueError("At least two clubs are needed to sweep clustering thresholds.")
+    default_threshold, results = _get_grouper().sweep_thresholds(club_list_for_grouper, sweep_input.thresholds)
+    return ThresholdSweepResult(default_threshold=default_threshold, results=results)
@@ -0,0 +1,82 @@
+import re
+import zlib
+
+import numpy as np
+
+# --- Near-Duplicate Email Detection ---
+# Forwards ("Re_ ..."), repeated reminders and mass blasts of the same
+# announcement inflate raw email counts. Each message is reduced to a MinHash
+# signature over word shingles of its subject and body; locality-sensitive
+# hashing on bands of the signature proposes candidate pairs in roughly linear
+# time, and only those pairs are checked against the similarity threshold.
+
+NUM_PERM = 128
+BANDS = 32              # 32 bands x 4 rows: pairs above ~0.42 Jaccard usually collide
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.5
+
+_PRIME = (1 << 32) - 5  # largest prime below 2**32; a * x + b stays within uint64
+_REPLY_PREFIX = re.compile(r"^\s*((re|fw|fwd)\s*[:_]\s*)+", re.IGNORECASE)
+_WORD = re.compile(r"\w+")
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingles(subject, body):
+    """Hashed word n-grams of the normalised subject and body."""
+    subject = _REPLY_PREFIX.sub("", subject or "")
+    words = _WORD.findall(f"{subject} {body or ''}".lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.unique(np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64))
+
+
+def minhash_signature(subject, body):
+    """Returns the MinHash signature, or None when the text has no words to shingle."""
+    shingles = _shingles(subject, body)
+    if not len(shingles):
+        return None
+    hashed = (_PERM_A[:, None] * shingles[None, :] + _PERM_B[:, None]) % _PRIME
+    return hashed.min(axis=1)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicate_clusters(records, threshold=DEFAULT_THRESHOLD):
+    """
+    Groups near-duplicate emails. `records` is a list of dicts with Subject and Body.
+    Returns a list with one cluster id per record; the id is the index of the
+    cluster's first record, so unique messages are their own cluster. Records
+    with no words (empty, or only emoji/punctuation) are never grouped.
+    """
+    signatures = [minhash_signature(r.get("Subject"), r.get("Body")) for r in records]
+    parent = list(range(len(records)))
+    rows = NUM_PERM // BANDS
+    hashed = [i for i, sig in enumerate(signatures) if sig is not None]
+
+    for band in range(BANDS):
+        buckets = {}
+        for i in hashed:
+            buckets.setdefault(signatures[i][band * rows:(band + 1) * rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            # Each member is compared with the bucket's first member only, so a bucket of
+            # n copies of the same blast costs n - 1 comparisons rather than n^2 / 2.
+            representative = members[0]
+            for other in members[1:]:
+                root_a, root_b = _find(parent, representative), _find(parent, other)
+                if root_a == root_b:
+                    continue
+                # Fraction of matching MinHash values estimates the Jaccard similarity.
+                if (signatures[representative] == signatures[other]).mean() >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return [_find(parent, i) for i in range(len(records))]
@@ -0,0 +1,258 @@
+import os
+import email
+import email.parser
+import email.policy
+import binascii
+import mimetypes
+
+from bs4 import BeautifulSoup
+
+# --- Email Parsing Library ---
+# Shared by the scraping service (and utils/emailScrapper.py through it) and the engagement scorer.
+# Two modes are offered: a header-only mode that never touches the message body,
+# and a full mode that extracts text and streams attachments to a blob store.
+
+# --- Streaming MIME Reader ---
+# .eml files are read line by line so that attachment and inline-image payloads
+# are decoded in small chunks straight into the blob store. Only the text parts
+# of a message are ever held in memory.
+
+def _strip_line_ending(line):
+    if line.endswith(b"\r\n"):
+        return line[:-2]
+    if line.endswith(b"\n"):
+        return line[:-1]
+    return line
+
+def _read_header_block(fp, policy=email.policy.compat32):
+    """
+    Reads raw header lines up to the blank separator line and parses only those,
+    leaving the file positioned at the start of the body.
+    """
+    lines = []
+    while True:
+        line = fp.readline()
+        if not line or line in (b"\r\n", b"\n"):
+            break
+        lines.append(line)
+    return email.parser.BytesHeaderParser(policy=policy).parsebytes(b"".join(lines))
+
+def _match_boundary(line, boundaries):
+    """Returns (boundary, is_close_delimiter) if the line is a delimiter for any open multipart."""
+    if not line.startswith(b"--"):
+        return None, False
+    stripped = line.rstrip()
+    for boundary in reversed(boundaries):
+        marker = b"--" + boundary
+        if stripped == marker:
+            return boundary, False
+        if stripped == marker + b"--":
+            return boundary, True
+    return None, False
+
+def _skip_to_boundary(fp, boundaries):
+    while True:
+        line = fp.readline()
+        if not line:
+            return None, False
+        hit, closed = _match_boundary(line, boundaries)
+        if hit is not None:
+            return hit, closed
+
+class _StreamDecoder:
+    """Incrementally undoes a Content-Transfer-Encoding one line at a time."""
+
+    def __init__(self, encoding):
+        self.encoding = (encoding or "7bit").strip().lower()
+        self._buffer = b""
+
+    def feed(self, line):
+        if self.encoding == "base64":
+            self._buffer += b"".join(line.split())
+            usable = len(self._buffer) - len(self._buffer) % 4
+            chunk, self._buffer = self._buffer[:usable], self._buffer[usable:]
+            return self._decode_base64(chunk)
+        if self.encoding == "quoted-printable":
+            return binascii.a2b_qp(line)
+        return line
+
+    def flush(self):
+        if self.encoding == "base64" and self._buffer:
+            chunk, self._buffer = self._buffer + b"=" * (-len(self._buffer) % 4), b""
+            return self._decode_base64(chunk)
+        return b""
+
+    @staticmethod
+    def _decode_base64(chunk):
+        if not chunk:
+            return b""
+        try:
+            return binascii.a2b_base64(chunk)
+        except binascii.Error:
+            return b""
+
+class _NullSink:
+    """Discards attachment bytes when no blob store is given."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+    def commit(self):
+        return {"sha256": "", "size": self.size, "new": False}
+
+    def abort(self):
+        pass
+
+class _TextSink:
+    def __init__(self, headers):
+        self.content_type = headers.get_content_type()
+        self.charset = headers.get_content_charset() or "utf-8"
+        self._chunks = []
+
+    def write(self, data):
+        if data:
+            self._chunks.append(data)
+
+    def abort(self):
+        self._chunks = []
+
+    def text(self):
+        raw = b"".join(self._chunks)
+        try:
+            return raw.decode(self.charset, errors="ignore")
+        except LookupError:
+            return raw.decode("utf-8", errors="ignore")
+
+def _is_text_part(headers):
+    return headers.get_content_maintype() == "text" and headers.get_content_disposition() != "attachment"
+
+def _blob_extension(headers):
+    filename = headers.get_filename()
+    extension = os.path.splitext(filename)[1].lower() if filename else ""
+    return extension or mimetypes.guess_extension(headers.get_content_type()) or ""
+
+def _consume_leaf(fp, headers, boundaries, store, texts, attachments):
+    if _is_text_part(headers):
+        sink = _TextSink(headers)
+    elif store is None:
+        sink = _NullSink()
+    else:
+        sink = store.open_writer(_blob_extension(headers))
+    decoder = _StreamDecoder(headers.get("Content-Transfer-Encoding"))
+
+    # The line break before a delimiter belongs to the delimiter, so each line
+    # is held back until we know whether the next one closes the part.
+    pending = None
+    hit, closed = None, False
+    try:
+        while True:
+            line = fp.readline()
+            if not line:
+                break
+            hit, closed = _match_boundary(line, boundaries)
+            if hit is not None:
+                break
+            if pending is not None:
+                sink.write(decoder.feed(pending))
+            pending = line
+        if pending is not None:
+            sink.write(decoder.feed(_strip_line_ending(pending)))
+        sink.write(decoder.flush())
+    except Exception:
+        # Don't leave a half-written .part file behind in the blob store.
+        sink.abort()
+        raise
+
+    if isinstance(sink, _TextSink):
+        texts.append((sink.content_type, sink.text()))
+    else:
+        ref = sink.commit()
+        if not ref["sha256"]:
+            return hit, closed
+        attachments.append({
+            "sha256": ref["sha256"],
+            "filename": headers.get_filename() or "",
+            "content_type": headers.get_content_type(),
+            "disposition": headers.get_content_disposition() or "",
+            "size": ref["size"],
+            "new": ref["new"],
+        })
+    return hit, closed
+
+def _walk_part(fp, headers, boundaries, store, texts, attachments):
+    """
+    Consumes the body of one MIME part (recursing into multiparts).
+    Returns the delimiter that ended it as (boundary, is_close), or (None, False) at EOF.
+    """
+    boundary = headers.get_boundary() if headers.get_content_maintype() == "multipart" else None
+    if not boundary:
+        return _consume_leaf(fp, headers, boundaries, store, texts, attachments)
+
+    inner = boundaries + [boundary.encode("ascii", errors="ignore")]
+    hit, closed = _skip_to_boundary(fp, inner)  # preamble
+    while hit == inner[-1] and not closed:
+        hit, closed = _walk_part(fp, _read_header_block(fp), inner, store, texts, attachments)
+    if hit != inner[-1]:
+        # Ended by an enclosing delimiter (or EOF) without our close delimiter.
+        return hit, closed
+    return _skip_to_boundary(fp, boundaries)  # epilogue
+
+def _header_fields(headers):
+    # The default policy decodes RFC 2047 encoded words (=?utf-8?B?...?=).
+    return {
+        "Subject": str(headers.get("subject", "")),
+        "Sender": str(headers.get("from", "")),
+        "Date": str(headers.get("date", "")),
+    }
+
+def _join_body(texts):
+    """
+    Concatenates every plain text part. HTML parts are only used, converted to
+    text, when the message has no plain text alternative.
+    """
+    plain = [text for ctype, text in texts if ctype == "text/plain"]
+    if plain:
+        return "\n".join(plain).strip()
+    html = [text for ctype, text in texts if ctype == "text/html"]
+    if html:
+        return BeautifulSoup(html[0], "html.parser").get_text().strip()
+    return "\n".join(text for _, text in texts).strip()
+
+# --- Public API ---
+
+def parse_email_headers(filepath):
+    """
+    Header-only mode: returns Subject/Sender/Date without reading the body.
+    Used for engagement counting, where only the sender matters.
+    """
+    with open(filepath, "rb") as f:
+        headers = _read_header_block(f, policy=email.policy.default)
+    return _header_fields(headers)
+
+def parse_email(filepath, store=None):
+    """
+    Full mode: returns Subject/Sender/Date, the extracted text Body and a list of
+    attachment references. Non-text parts are streamed into `store` (a BlobStore);
+    with no store they are decoded and discarded without being kept in memory.
+    """
+    texts, attachments = [], []
+    with open(filepath, "rb") as f:
+        headers = _read_header_block(f, policy=email.policy.default)
+        _walk_part(f, headers, [], store, texts, attachments)
+    record = _header_fields(headers)
+    record["Body"] = _join_body(texts)
+    record["Attachments"] = attachments
+    return record
+
+def list_eml_files(eml_folder):
+    if not os.path.isdir(eml_folder):
+        raise FileNotFoundError(f"The directory '{eml_folder}' was not found.")
+    return [os.path.join(eml_folder, name) for name in sorted(os.listdir(eml_folder)) if name.endswith(".eml")]
+
+def scan_email_headers(eml_folder):
+    """Runs header-only mode over every .eml file in a folder."""
+    return [dict(parse_email_headers(path), File=os.path.basename(path)) for path in list_eml_files(eml_folder)]
+
@@ -0,0 +1,182 @@
+import os
+import glob
+from datetime import date
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+import pandas as pd
+
+from models.engagement import ClubEngagement, EngagementWindow, EngagementResult
+from services import email_parser
+from services.chat_state import load_chat_state
+
+# --- Windowed Engagement Scoring Engine ---
+# Chats and emails are reduced once to a (clubs x days) matrix of message counts.
+# Chat counts come from the per-day totals of each chat's persisted metric state,
+# so an appended export only costs a parse of the new messages.
+# Cumulative sums over the day axis then answer any date window in O(1) per club,
+# and decayed scores need a single pass over the days in the window, so changing
+# the window, half-life or weights never re-parses the sources.
+
+WHATSAPP_DIR = "whatsapp"
+EML_FOLDER = "mails"
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class EngagementEngine:
+    def __init__(self, clubs, first_day, chat_counts, email_counts):
+        self.clubs = list(clubs)
+        self.first_day = first_day  # ordinal of column 0
+        self.chat_counts = chat_counts
+        self.email_counts = email_counts
+        zeros = np.zeros((len(self.clubs), 1))
+        self._chat_cum = np.hstack([zeros, np.cumsum(chat_counts, axis=1)])
+        self._email_cum = np.hstack([zeros, np.cumsum(email_counts, axis=1)])
+
+    @property
+    def num_days(self):
+        return self.chat_counts.shape[1]
+
+    @property
+    def date_range(self):
+        if self.num_days == 0:
+            return None, None
+        return date.fromordinal(self.first_day), date.fromordinal(self.first_day + self.num_days - 1)
+
+    @classmethod
+    def build(cls, whatsapp_dir=WHATSAPP_DIR, eml_folder=EML_FOLDER):
+        """
+        Reads the per-day totals of every chat and every email header once and
+        bins the messages per club per day.
+        """
+        print("Pre-aggregating daily engagement counts...")
+        chat_days = {}  # club -> {ordinal: messages}
+        for chat_file in sorted(glob.glob(os.path.join(whatsapp_dir, "*.txt"))):
+            club = os.path.basename(chat_file).replace(".txt", "")
+            daily = load_chat_state(chat_file).daily
+            chat_days[club] = {day + _EPOCH_ORDINAL: count for day, count in daily.items()}
+        clubs = sorted(chat_days)
+
+        # Emails are attributed to a club when the sender contains the club name,
+        # using the same str.contains match as get_total_engagement_scores.
+        email_days = {club: [] for club in clubs}
+        if os.path.isdir(eml_folder):
+            senders, sent_days = [], []
+            for headers in email_parser.scan_email_headers(eml_folder):
+                try:
+                    sent_days.append(parsedate_to_datetime(headers["Date"]).date().toordinal())
+                except (TypeError, ValueError):
+                    continue
+                senders.append(headers["Sender"])
+            senders, sent_days = pd.Series(senders, dtype=object), np.array(sent_days, dtype=np.int64)
+            for club in clubs:
+                matched = senders.str.contains(club, case=False, na=False).to_numpy(dtype=bool)
+                email_days[club] = sent_days[matched].tolist()
+
+        all_days = [d for days in chat_days.values() for d in days] + [d for days in email_days.values() for d in days]
+        if not all_days:
+            empty = np.zeros((len(clubs), 0))
+            return cls(clubs, 0, empty, empty.copy())
+
+        first_day = min(all_days)
+        num_days = max(all_days) - first_day + 1
+        chat_counts = np.zeros((len(clubs), num_days))
+        email_counts = np.zeros((len(clubs), num_days))
+        for i, club in enumerate(clubs):
+            for day, count in chat_days[club].items():
+                chat_counts[i, day - first_day] = count
+            if email_days[club]:
+                np.add.at(email_counts[i], np.array(email_days[club]) - first_day, 1)
+        print(f"Aggregated {len(clubs)} clubs over {num_days} days.")
+        return cls(clubs, first_day, chat_counts, email_counts)
+
+    def window_totals(self, start, end, half_life_days=None):
+        """
+        Returns (whatsapp, email) message totals per club for the inclusive
+        window [start, end]. With a half-life, each day's count is weighted by
+        0.5 ** (days_before_end / half_life_days).
+        """
+        s = max(start.toordinal() - self.first_day, 0)
+        e = min(end.toordinal() - self.first_day, self.num_days - 1)
+        if e < s:
+            zeros = np.zeros(len(self.clubs))
+            return zeros, zeros.copy()
+        if not half_life_days:
+            return (self._chat_cum[:, e + 1] - self._chat_cum[:, s],
+                    self._email_cum[:, e + 1] - self._email_cum[:, s])
+        ages = (end.toordinal() - self.first_day) - np.arange(s, e + 1)
+        weights = 0.5 ** (ages / half_life_days)
+        return self.chat_counts[:, s:e + 1] @ weights, self.email_counts[:, s:e + 1] @ weights
+
+    def score_window(self, start, end, half_life_days=None, whatsapp_weight=0.6, email_weight=0.4):
+        chat, mails = self.window_totals(start, end, half_life_days)
+        total = whatsapp_weight * _min_max(chat) + email_weight * _min_max(mails)
+        scores = [
+            ClubEngagement(name=club, whatsapp_messages=float(chat[i]), emails=float(mails[i]), total_engagement_score=float(total[i]))
+            for i, club in enumerate(self.clubs)
+        ]
+        scores.sort(key=lambda x: x.total_engagement_score, reverse=True)
+        return EngagementWindow(start=start, end=end, clubs=scores)
+
+    def query(self, start=None, end=None, period=None, half_life_days=None, whatsapp_weight=0.6, email_weight=0.4):
+        """
+        Scores a single window, or every calendar month / semester inside it when
+        `period` is given. Missing bounds default to the full data range.
+        Raises ValueError if the window ends before it starts.
+        """
+        first, last = self.date_range
+        start = start or first
+        end = end or last
+        if start is not None and end is not None and start > end:
+            raise ValueError(f"Window start {start} is after its end {end}.")
+        windows = []
+        if start is not None and end is not None:
+            bounds = _period_bounds(start, end, period) if period else [(start, end)]
+            windows = [
+                self.score_window(ws, we, half_life_days, whatsapp_weight, email_weight)
+                for ws, we in bounds
+            ]
+        return EngagementResult(period=period, half_life_days=half_life_days, windows=windows)
+
+
+def _min_max(values):
+    # Same 0-1 normalisation as get_total_engagement_scores.
+    if len(values) == 0 or values.max() == values.min():
+        return np.zeros(len(values))
+    return (values - values.min()) / (values.max() - values.min())
+
+
+def _period_bounds(start, end, period):
+    """Splits [start, end] on calendar month or semester (Jan-Jun, Jul-Dec) boundaries."""
+    step = 1 if period == "month" else 6
+    month = start.month if period == "month" else (1 if start.month <= 6 else 7)
+    year = start.year
+    bounds = []
+    while date(year, month, 1) <= end:
+        next_year, next_month = (year + 1, month + step - 12) if month + step > 12 else (year, month + step)
+        window_start = max(date(year, month, 1), start)
+        window_end = min(date.fromordinal(date(next_year, next_month, 1).toordinal() - 1), end)
+        bounds.append((window_start, window_end))
+        year, month = next_year, next_month
+    return bounds
+
+
+# --- Engine Cache ---
+# The engine is rebuilt only when a chat export or mail file is added, removed or modified.
+
+_engine = None
+_engine_signature = None
+
+
+def _source_signature(whatsapp_dir, eml_folder):
+    paths = glob.glob(os.path.join(whatsapp_dir, "*.txt")) + glob.glob(os.path.join(eml_folder, "*.eml"))
+    return tuple(sorted((path, os.path.getmtime(path), os.path.getsize(path)) for path in paths))
+
+
+def get_engagement_engine(whatsapp_dir=WHATSAPP_DIR, eml_folder=EML_FOLDER):
+    global _engine, _engine_signature
+    signature = _source_signature(whatsapp_dir, eml_folder)
+    if _engine is None or signature != _engine_signature:
+        _engine = EngagementEngine.build(whatsapp_dir, eml_folder)
+        _engine_signature = signature
+    return _engine
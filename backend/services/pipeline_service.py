@@ -0,0 +1,187 @@
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.club import ClubDataInput
+from models.pipeline import StageReport, PipelineReport
+from services import scraping_service, clustering_service
+from services.club_crawler import ClubCrawler, save_club_data
+
+# --- Pipeline Runner ---
+# The end-to-end flow is modelled as a small DAG. Each stage declares the files
+# it reads and writes; a stage is skipped when its outputs exist and neither its
+# inputs nor its outputs have changed since it last succeeded. Stages that read
+# from the network have no local inputs to fingerprint, so they always run and
+# rely on their own revalidation; downstream stages still skip when the files
+# they produce come out unchanged. If such a stage fails (e.g. the site is
+# unreachable) but its previous outputs exist, it is reported as "stale" and
+# downstream stages carry on with those outputs. Stages whose dependencies are
+# satisfied run concurrently.
+#
+#   clubs (ClubCrawler)  ------------------------\
+#   emails (scrape_emails)  -----------------------> clustering
+#   whatsapp (analyze_whatsapp_chats) -----------/
+#
+# Usage from the backend directory:  python -m services.pipeline_service [--force] [stage ...]
+
+MANIFEST_PATH = "pipeline_manifest.json"
+CLUBS_JSON = "clubs.json"
+CLUSTERING_OUTPUT = "clustering_result.json"
+
+
+class Stage:
+    def __init__(self, name, run, inputs, outputs, deps=(), always_run=False):
+        self.name = name
+        self.run = run
+        self.inputs = inputs      # glob patterns
+        self.outputs = outputs    # file paths
+        self.deps = tuple(deps)
+        self.always_run = always_run
+
+
+def _run_crawler():
+    # Pages are revalidated against the local page cache, so an unchanged site
+    # costs one 304 per page and rewrites clubs.json byte-for-byte.
+    save_club_data(ClubCrawler().crawl(), json_path=CLUBS_JSON)
+
+
+def _run_clustering():
+    with open(CLUBS_JSON, "r", encoding="utf-8") as f:
+        club_data = ClubDataInput.model_validate(json.load(f))
+    result = clustering_service.run_clustering_and_ranking(club_data)
+    with open(CLUSTERING_OUTPUT, "w", encoding="utf-8") as f:
+        json.dump(result.model_dump(), f, ensure_ascii=False, indent=2)
+
+
+STAGES = [
+    Stage("clubs", _run_crawler, inputs=["services/club_crawler.py"], outputs=[CLUBS_JSON, "clubs_paragraphs.txt"], always_run=True),
+    Stage("emails", scraping_service.scrape_emails, inputs=["mails/*.eml"], outputs=["2024_full_mails.csv"]),
+    Stage("whatsapp", scraping_service.analyze_whatsapp_chats, inputs=["whatsapp/*.txt"], outputs=["club_engagement_analysis.csv"]),
+    Stage(
+        "clustering", _run_clustering,
+        inputs=[CLUBS_JSON, "2024_full_mails.csv", "club_engagement_analysis.csv"],
+        outputs=[CLUSTERING_OUTPUT],
+        deps=["clubs", "emails", "whatsapp"],
+    ),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+# --- Fingerprints ---
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(patterns):
+    """Hashes the names and contents of every file matched by the patterns."""
+    digest = hashlib.sha256()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            digest.update(path.encode("utf-8"))
+            digest.update(_hash_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _is_current(stage, manifest):
+    entry = manifest.get(stage.name)
+    if stage.always_run or not entry or not all(os.path.exists(path) for path in stage.outputs):
+        return False
+    return entry["inputs"] == _fingerprint(stage.inputs) and entry["outputs"] == _fingerprint(stage.outputs)
+
+
+# --- Runner ---
+
+def run_pipeline(force=False, only=None, max_workers=4) -> PipelineReport:
+    """
+    Runs the pipeline and returns a per-stage report. `only` restricts the run to
+    the named stages (their dependencies are not pulled in); `force` re-runs stages
+    even when they are up to date.
+    """
+    selected = [stage for stage in STAGES if only is None or stage.name in only]
+    unknown = set(only or []) - set(STAGES_BY_NAME)
+    if unknown:
+        raise ValueError(f"Unknown pipeline stage(s): {', '.join(sorted(unknown))}")
+
+    selected_names = {stage.name for stage in selected}
+    manifest = _load_manifest()
+    manifest_lock = threading.Lock()
+    reports = {}
+    pipeline_start = time.perf_counter()
+
+    def execute(stage):
+        start = time.perf_counter()
+        if not force and _is_current(stage, manifest):
+            print(f"[pipeline] {stage.name}: up to date, skipping.")
+            return StageReport(name=stage.name, status="skipped", seconds=time.perf_counter() - start)
+        print(f"[pipeline] {stage.name}: running...")
+        try:
+            stage.run()
+        except Exception as e:
+            if stage.always_run and all(os.path.exists(path) for path in stage.outputs):
+                print(f"[pipeline] {stage.name}: failed ({e}); keeping existing outputs.")
+                return StageReport(name=stage.name, status="stale", seconds=time.perf_counter() - start, detail=f"Kept existing outputs: {e}")
+            return StageReport(name=stage.name, status="failed", seconds=time.perf_counter() - start, detail=str(e))
+        entry = {"inputs": _fingerprint(stage.inputs), "outputs": _fingerprint(stage.outputs)}
+        with manifest_lock:
+            manifest[stage.name] = entry
+            with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        seconds = time.perf_counter() - start
+        print(f"[pipeline] {stage.name}: done in {seconds:.2f}s.")
+        return StageReport(name=stage.name, status="ran", seconds=seconds)
+
+    pending = list(selected)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending:
+            # A stage is ready once every selected dependency has finished.
+            ready = [s for s in pending if all(d in reports for d in s.deps if d in selected_names)]
+            pending = [s for s in pending if s not in ready]
+            to_run = []
+            for stage in ready:
+                failed = [d for d in stage.deps if d in reports and reports[d].status in ("failed", "blocked")]
+                if failed:
+                    reports[stage.name] = StageReport(name=stage.name, status="blocked", seconds=0.0, detail=f"Upstream failed: {', '.join(failed)}")
+                else:
+                    to_run.append(stage)
+            for stage, report in zip(to_run, pool.map(execute, to_run)):
+                reports[stage.name] = report
+
+    return PipelineReport(
+        stages=[reports[stage.name] for stage in selected],
+        total_seconds=time.perf_counter() - pipeline_start,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the club analysis pipeline, skipping up-to-date stages.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to run (default: all). One of: {', '.join(STAGES_BY_NAME)}")
+    parser.add_argument("--force", action="store_true", help="Re-run stages even if their outputs are current.")
+    args = parser.parse_args()
+
+    report = run_pipeline(force=args.force, only=args.stages or None)
+    print("\n⏱️ Pipeline Report")
+    for stage in report.stages:
+        line = f"- {stage.name:<11} {stage.status:<8} {stage.seconds:8.2f}s"
+        print(line + (f"  ({stage.detail})" if stage.detail else ""))
+    print(f"Total wall time: {report.total_seconds:.2f}s")
+    if any(stage.status in ("failed", "blocked") for stage in report.stages):
+        sys.exit(1)
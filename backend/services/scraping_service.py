@@ -1,5 +1,4 @@
 import os
-import email
 import subprocess
 import glob
 import json
@@ -7,14 +6,18 @@ import re
 from datetime import datetime
 
 import pandas as pd
-from bs4 import BeautifulSoup
-import numpy as np
+
+from services import email_parser, email_dedup
+from services.blob_store import BlobStore
+from services.chat_state import load_chat_state
 
 # --- Email Scraping Service ---
 
 def scrape_emails():
     """
     Reads .eml files from the 'mails' directory, parses them, and saves the content to a CSV file.
+    Attachments and inline images are stored once per unique content in the blob store and
+    referenced from the `Attachments` column. Near-duplicate emails share a `DuplicateCluster` id.
     Returns the path to the output CSV.
     """
     print("Starting email scraping service...")
@@ -22,39 +25,28 @@ def scrape_emails():
     eml_folder = "mails"
     output_csv = "2024_full_mails.csv"
 
-    if not os.path.isdir(eml_folder):
-        raise FileNotFoundError(f"The directory '{eml_folder}' was not found.")
-
+    store = BlobStore()
     data = []
-    for filename in os.listdir(eml_folder):
-        if filename.endswith(".eml"):
-            filepath = os.path.join(eml_folder, filename)
-            with open(filepath, "rb") as f:
-                raw_msg = email.message_from_binary_file(f)
-
-            subject = raw_msg.get("subject", "")
-            sender = raw_msg.get("from", "")
-            date = raw_msg.get("date", "")
-            body = ""
-
-            if raw_msg.is_multipart():
-                for part in raw_msg.walk():
-                    if part.get_content_type() == "text/plain" and "attachment" not in str(part.get("Content-Disposition")):
-                        body = part.get_payload(decode=True).decode(errors="ignore").strip()
-                        break # Take the first plain text part
+    new_blobs = reused_blobs = 0
+    for filepath in email_parser.list_eml_files(eml_folder):
+        record = email_parser.parse_email(filepath, store)
+        record["File"] = os.path.basename(filepath)
+        for ref in record["Attachments"]:
+            if ref.pop("new"):
+                new_blobs += 1
             else:
-                payload = raw_msg.get_payload(decode=True)
-                if payload:
-                    body = payload.decode(errors="ignore").strip()
-            
-            # Basic HTML cleanup if body is still HTML
-            if "<html" in body.lower():
-                body = BeautifulSoup(body, "html.parser").get_text()
+                reused_blobs += 1
+        record["Attachments"] = json.dumps(record["Attachments"])
+        data.append(record)
 
-            data.append({"Subject": subject, "Sender": sender, "Date": date, "Body": body})
+    # Tag near-duplicates (forwards, reminders, repeated blasts) so they can be counted once.
+    for record, cluster in zip(data, email_dedup.find_duplicate_clusters(data)):
+        record["DuplicateCluster"] = cluster
+    print(f"Found {len(set(r['DuplicateCluster'] for r in data))} unique announcements among {len(data)} emails.")
 
     df = pd.DataFrame(data)
     df.to_csv(output_csv, index=False, encoding="utf-8")
+    print(f"Stored {new_blobs} new attachment blobs, {reused_blobs} deduplicated against existing blobs.")
     print(f"Email scraping complete. Saved {len(df)} emails to {output_csv}")
     return os.path.abspath(output_csv)
 
@@ -98,62 +90,54 @@ CHAT_FORMATS = [
     { "pattern": re.compile(r"^(\d{1,2}/\d{1,2}/\d{2}), (\d{1,2}:\d{2} (?:am|pm|AM|PM)) - ([^:]+): (.*)$" ), "date_parser": lambda m: datetime.strptime(f"{m.group(1)}, {m.group(2)}", "%d/%m/%y, %I:%M %p"), "user_group": 3, "msg_group": 4, "pre_process": None}
 ]
 
-def _analyze_chat_file(chat_file_path):
+def parse_chat_lines(lines):
+    """
+    Parses lines of a WhatsApp export into a list of [datetime, user, message] rows,
+    detecting the export format line by line.
+    """
     rows = []
+    for line in lines:
+        for fmt in CHAT_FORMATS:
+            processed_line = fmt["pre_process"](line) if fmt["pre_process"] else line
+            match = fmt["pattern"].match(processed_line.strip())
+            if match:
+                try:
+                    dt = fmt["date_parser"](match)
+                    user = match.group(fmt["user_group"])
+                    msg = match.group(fmt["msg_group"])
+                    rows.append([dt, user, msg])
+                    break
+                except (ValueError, IndexError):
+                    continue
+    return rows
+
+def parse_chat_file(chat_file_path):
     with open(chat_file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            for fmt in CHAT_FORMATS:
-                processed_line = fmt["pre_process"](line) if fmt["pre_process"] else line
-                match = fmt["pattern"].match(processed_line.strip())
-                if match:
-                    try:
-                        dt = fmt["date_parser"](match)
-                        user = match.group(fmt["user_group"])
-                        msg = match.group(fmt["msg_group"])
-                        rows.append([dt, user, msg])
-                        break
-                    except (ValueError, IndexError):
-                        continue
-    if not rows:
+        return parse_chat_lines(f)
+
+# Weights of Activity, Participation, Responsiveness and Sustainability in the CEI.
+CEI_WEIGHTS = (0.4, 0.3, 0.2, 0.1)
+
+def _analyze_chat_file(chat_file_path, cei_weights=CEI_WEIGHTS):
+    state = load_chat_state(chat_file_path)
+    if not state.messages:
         return None
 
-    df = pd.DataFrame(rows, columns=["Datetime", "User", "Message"])
-    df["Date"] = df["Datetime"].dt.date
-    activity = df.groupby("Date").size().mean() if not df.empty else 0
-    user_counts = df["User"].value_counts()
-    if not user_counts.empty:
-        total_msgs = user_counts.sum()
-        probs = user_counts / total_msgs
-        entropy = -(probs * np.log2(probs)).sum()
-        max_entropy = np.log2(len(user_counts)) if len(user_counts) > 1 else 1
-        participation = entropy / max_entropy if max_entropy > 0 else 0
-    else:
-        participation = 0
-    df_sorted = df.sort_values("Datetime").reset_index(drop=True)
-    delays = []
-    for i in range(1, len(df_sorted)):
-        if df_sorted.loc[i, "User"] != df_sorted.loc[i-1, "User"]:
-            delta = (df_sorted.loc[i, "Datetime"] - df_sorted.loc[i-1, "Datetime"]).total_seconds() / 60
-            if 0 < delta < 180:
-                delays.append(delta)
-    responsiveness = 1 / (1 + np.mean(delays)) if delays else 0.5
-    if not df.empty:
-        weekly = df.groupby(pd.Grouper(key="Datetime", freq="W")).size()
-        sustainability = 1 / (1 + weekly.std()) if len(weekly) > 1 else 1
-    else:
-        sustainability = 0
-    cei = (0.4 * activity + 0.3 * participation + 0.2 * responsiveness + 0.1 * sustainability)
+    activity, participation, responsiveness, sustainability = state.metrics()
+    w_activity, w_participation, w_responsiveness, w_sustainability = cei_weights
+    cei = (w_activity * activity + w_participation * participation + w_responsiveness * responsiveness + w_sustainability * sustainability)
     if cei > 100: rating = "⭐⭐⭐⭐⭐"
     elif cei > 50: rating = "⭐⭐⭐⭐"
     elif cei > 20: rating = "⭐⭐⭐"
     elif cei > 10: rating = "⭐⭐"
     else: rating = "⭐"
-    return {"Club": os.path.basename(chat_file_path).replace(".txt", ""), "Activity (msgs/day)": activity, "Participation": participation, "Responsiveness": responsiveness, "Sustainability": sustainability, "CEI": cei, "Rating": rating}
+    return {"Club": os.path.basename(chat_file_path).replace(".txt", ""), "Activity (msgs/day)": float(activity), "Participation": float(participation), "Responsiveness": float(responsiveness), "Sustainability": float(sustainability), "CEI": float(cei), "Rating": rating}
 
-def analyze_whatsapp_chats():
+def iter_whatsapp_analysis(cei_weights=CEI_WEIGHTS):
     """
-    Finds all chat files in the 'whatsapp' directory, analyzes them, and saves to a CSV.
-    Returns the content of the CSV as a JSON array.
+    Generator version of `analyze_whatsapp_chats` for streaming responses.
+    Yields a `start` event, one `club` event as each chat finishes, and a final
+    `done` event once the CSV has been saved.
     """
     print("Starting WhatsApp analysis service...")
     whatsapp_dir = "whatsapp"
@@ -163,16 +147,28 @@ def analyze_whatsapp_chats():
         raise FileNotFoundError(f"The directory '{whatsapp_dir}' was not found.")
 
     chat_files = glob.glob(os.path.join(whatsapp_dir, "*.txt"))
+    yield {"event": "start", "total": len(chat_files)}
+
+    # Only one small metrics row per club is kept, for the sorted CSV.
     all_metrics = []
-    for chat_file in chat_files:
-        metrics = _analyze_chat_file(chat_file)
+    for i, chat_file in enumerate(chat_files):
+        metrics = _analyze_chat_file(chat_file, cei_weights)
         if metrics:
             all_metrics.append(metrics)
+            yield {"event": "club", "index": i, "data": metrics}
 
-    if not all_metrics:
-        return []
+    if all_metrics:
+        df_all = pd.DataFrame(all_metrics).sort_values("CEI", ascending=False).reset_index(drop=True)
+        df_all.to_csv(output_csv, index=False)
+        print(f"WhatsApp analysis complete. Saved results to {output_csv}")
+    yield {"event": "done", "processed": len(all_metrics), "output_file": os.path.abspath(output_csv) if all_metrics else None}
 
-    df_all = pd.DataFrame(all_metrics).sort_values("CEI", ascending=False).reset_index(drop=True)
-    df_all.to_csv(output_csv, index=False)
-    print(f"WhatsApp analysis complete. Saved results to {output_csv}")
-    return df_all.to_dict(orient='records')
+def analyze_whatsapp_chats(cei_weights=CEI_WEIGHTS):
+    """
+    Finds all chat files in the 'whatsapp' directory, analyzes them, and saves to a CSV.
+    Per-chat metric state is persisted next to each export, so a re-run only parses
+    messages appended since the last one, and different `cei_weights` need no parsing.
+    Returns the content of the CSV as a JSON array.
+    """
+    all_metrics = [event["data"] for event in iter_whatsapp_analysis(cei_weights) if event["event"] == "club"]
+    return sorted(all_metrics, key=lambda m: m["CEI"], reverse=True)
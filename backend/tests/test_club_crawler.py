@@ -0,0 +1,48 @@
+import os, sys
+import shutil
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+# allow `python -m pytest tests` from the backend directory
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(BACKEND_DIR)
+from services.club_crawler import ClubCrawler
+
+CLUBS_RAW_HTML = os.path.join(BACKEND_DIR, "clubs_raw.html")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def clubs_site(tmp_path):
+    """Serves the saved clubs page at http://127.0.0.1:<port>/clubs/."""
+    site = tmp_path / "site"
+    (site / "clubs").mkdir(parents=True)
+    shutil.copy(CLUBS_RAW_HTML, site / "clubs" / "index.html")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(site)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/clubs/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_crawl_extracts_clubs_and_revalidates(clubs_site, tmp_path):
+    cache_dir = str(tmp_path / "page_cache")
+
+    first = ClubCrawler(clubs_site, cache_dir=cache_dir, proxy_template=None)
+    club_data = first.crawl()
+    assert len(club_data.clubs) == 17
+    assert all(club.description for club in club_data.clubs)
+    assert first.stats == {"fetched": 1, "revalidated": 0}
+
+    # A fresh crawler over the same cache sends If-Modified-Since and gets a 304.
+    second = ClubCrawler(clubs_site, cache_dir=cache_dir, proxy_template=None)
+    assert second.crawl() == club_data
+    assert second.stats == {"fetched": 0, "revalidated": 1}
@@ -1,25 +1,44 @@
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import AgglomerativeClustering
+from scipy.cluster.hierarchy import linkage, fcluster
+from sklearn.metrics import silhouette_score
 from sklearn.neighbors import NearestNeighbors
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
+import hashlib
+from collections import OrderedDict
+
+# The grouper lives for the whole server process, so its caches keep only the
+# most recently used club sets.
+CACHE_SIZE = 8
+
+def _cache_get(cache, key):
+    if key not in cache:
+        return None
+    cache.move_to_end(key)
+    return cache[key]
+
+def _cache_put(cache, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
 
 class AdvancedClubGrouper:
     def __init__(self):
         print("Loading sentence transformer model (may download on first run)...")
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.clusterer = AgglomerativeClustering(
-            n_clusters=None,
-            metric='cosine',
-            linkage='average'
-        )
+        # LRU caches keyed by the input descriptions and by the embedding bytes, so
+        # repeated calls on the same clubs skip both encoding and tree building.
+        self._embedding_cache = OrderedDict()
+        self._tree_cache = OrderedDict()
 
     def _find_optimal_threshold(self, embeddings):
         """
         Finds an optimal distance threshold using a simple statistical measure
         that is more robust for small datasets.
         """
-        k = 3
+        # Capped by the number of clubs so small sets (e.g. a 2-club sweep) still work.
+        k = min(3, len(embeddings))
         print(f"Finding optimal distance threshold using k={k} nearest neighbors...")
 
         nbrs = NearestNeighbors(n_neighbors=k, metric='cosine').fit(embeddings)
@@ -38,15 +57,8 @@ class AdvancedClubGrouper:
         print(f"Automatically determined optimal distance threshold: {optimal_threshold:.4f}")
         return optimal_threshold
 
-    def group_clubs(self, club_data):
-        if not club_data or len(club_data) < 2:
-            print("Not enough club data to perform clustering.")
-            return {}, [club['name'] for club in club_data]
-
-        names = [club['name'] for club in club_data]
-        descriptions = [club['description'] for club in club_data]
-
-        # --- Step 1: Summarize descriptions using TF-IDF to extract keywords ---
+    def _summarize(self, names, descriptions):
+        """Reduces each description to its top TF-IDF keywords."""
         print("\nStep 1: Summarizing descriptions into keywords using TF-IDF...")
         summaries = []
         try:
@@ -72,21 +84,42 @@ class AdvancedClubGrouper:
         print("\nGenerated Summaries (Keywords):")
         for i in range(len(names)):
             print(f"- {names[i]}: {summaries[i]}")
+        return summaries
 
-        # --- Step 2: Encode the keyword-based summaries ---
+    def _encode(self, summaries):
+        key = tuple(summaries)
+        embeddings = _cache_get(self._embedding_cache, key)
+        if embeddings is not None:
+            print("\nStep 2: Reusing cached semantic vectors.")
+            return embeddings
         print("\nStep 2: Encoding summarized descriptions into semantic vectors...")
         embeddings = self.model.encode(summaries, show_progress_bar=True)
+        _cache_put(self._embedding_cache, key, embeddings)
+        return embeddings
 
-        # --- Step 3: Find the optimal clustering threshold ---
-        optimal_threshold = self._find_optimal_threshold(embeddings)
-        
-        # --- Step 4: Run Clustering ---
-        print(f"\nStep 4: Running Agglomerative Clustering with threshold={optimal_threshold:.4f}...")
-        self.clusterer.set_params(distance_threshold=optimal_threshold)
-        self.clusterer.fit(embeddings)
-    
-        labels = self.clusterer.labels_
-        
+    def build_tree(self, embeddings):
+        """
+        Builds the full average-linkage dendrogram over cosine distances once per
+        embedding set. Any distance threshold can then be applied by cutting it.
+        """
+        embeddings = np.asarray(embeddings)
+        key = hashlib.sha1(embeddings.tobytes()).hexdigest()
+        tree = _cache_get(self._tree_cache, key)
+        if tree is None:
+            tree = linkage(embeddings, method='average', metric='cosine')
+            _cache_put(self._tree_cache, key, tree)
+        return tree
+
+    @staticmethod
+    def _cut_tree(tree, threshold):
+        """
+        Keeps every merge at distance <= threshold. AgglomerativeClustering(distance_threshold=t)
+        only keeps merges strictly below t, so the two differ when t is exactly a merge height.
+        """
+        return fcluster(tree, threshold, criterion='distance')
+
+    @staticmethod
+    def _labels_to_groups(names, labels):
         temp_clusters = {}
         for i, label in enumerate(labels):
             if label not in temp_clusters:
@@ -100,9 +133,84 @@ class AdvancedClubGrouper:
                 outliers.extend(clubs)
             else:
                 clusters[len(clusters)] = clubs
+        return clusters, outliers
+
+    def sweep_thresholds(self, club_data, thresholds=None):
+        """
+        Cuts the cached dendrogram at many distance thresholds in one call.
+        Without explicit thresholds, every merge height of the tree is tried, plus
+        the automatically determined default. Returns (default_threshold, results),
+        where each result holds the groups and quality scores for one threshold.
+        """
+        names = [club['name'] for club in club_data]
+        descriptions = [club['description'] for club in club_data]
+        embeddings = self._encode(self._summarize(names, descriptions))
+        tree = self.build_tree(embeddings)
+        default_threshold = float(self._find_optimal_threshold(embeddings))
+
+        if thresholds is None:
+            # Cutting at a merge height includes that merge (distance <= threshold),
+            # so each distinct height is a distinct grouping.
+            thresholds = sorted(set(tree[:, 2].tolist()) | {default_threshold})
+
+        results = []
+        for threshold in thresholds:
+            labels = self._cut_tree(tree, threshold)
+            clusters, outliers = self._labels_to_groups(names, labels)
+            num_labels = len(set(labels))
+            # Silhouette is only defined for 2..n-1 groups (outliers count as their own group).
+            silhouette = None
+            if 2 <= num_labels <= len(names) - 1:
+                silhouette = float(silhouette_score(embeddings, labels, metric='cosine'))
+            results.append({
+                "threshold": float(threshold),
+                "num_clusters": len(clusters),
+                "cluster_sizes": sorted((len(clubs) for clubs in clusters.values()), reverse=True),
+                "outlier_count": len(outliers),
+                "silhouette": silhouette,
+                "clusters": clusters,
+                "outliers": outliers,
+            })
+        return default_threshold, results
+
+    def iter_group_clubs(self, club_data):
+        """
+        Generator version of `group_clubs`. Yields a ("stage", name) event as each
+        step starts and finishes with ("result", (clusters, outliers)).
+        """
+        if not club_data or len(club_data) < 2:
+            print("Not enough club data to perform clustering.")
+            yield "result", ({}, [club['name'] for club in club_data])
+            return
+
+        names = [club['name'] for club in club_data]
+        descriptions = [club['description'] for club in club_data]
+
+        # --- Step 1: Summarize descriptions using TF-IDF to extract keywords ---
+        yield "stage", "summarizing"
+        summaries = self._summarize(names, descriptions)
+
+        # --- Step 2: Encode the keyword-based summaries ---
+        yield "stage", "encoding"
+        embeddings = self._encode(summaries)
+
+        # --- Step 3: Find the optimal clustering threshold ---
+        yield "stage", "thresholding"
+        optimal_threshold = self._find_optimal_threshold(embeddings)
+        
+        # --- Step 4: Run Clustering ---
+        yield "stage", "clustering"
+        print(f"\nStep 4: Cutting the average-linkage tree at threshold={optimal_threshold:.4f}...")
+        labels = self._cut_tree(self.build_tree(embeddings), optimal_threshold)
+        clusters, outliers = self._labels_to_groups(names, labels)
 
         print("\nClustering complete.")
-        return clusters, outliers
+        yield "result", (clusters, outliers)
+
+    def group_clubs(self, club_data):
+        for kind, payload in self.iter_group_clubs(club_data):
+            if kind == "result":
+                return payload
 
 
 if __name__ == '__main__':
@@ -1,27 +1,13 @@
-import requests
-import urllib.parse
-from bs4 import BeautifulSoup
+import os, sys
 
-# target url via scrape.do
-targetUrl = urllib.parse.quote("https://www.snuchennai.edu.in/clubs/")
-url = "http://api.scrape.do/?url={}&token=73f7c02b36694c8795b7ff0aea5d40b5919ed68fb46".format(targetUrl)
+# allow `python utils/webscrapper.py` from the backend directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.club_crawler import ClubCrawler, save_club_data
 
-response = requests.get(url)
-
-# parse HTML
-soup = BeautifulSoup(response.text, "html.parser")
-
-# extract all <p> tags
-paragraphs = [p.get_text(strip=True) for p in soup.find_all("p")]
-
-# save to text file
-with open("clubs_paragraphs.txt", "w", encoding="utf-8") as f:
-    for para in paragraphs:
-        if para == "Will Be Updated Soon…":
-            continue
-        else:
-            f.write(para + "\n")
-
-print(f"✅ Extracted {len(paragraphs)} paragraphs → saved to clubs_paragraphs.txt")
+# fetched via scrape.do (club_crawler.PROXY_TEMPLATE), same as the pipeline's clubs stage
+club_data = ClubCrawler().crawl()
 
+# save as ClubDataInput JSON and one description per line
+save_club_data(club_data)
 
+print(f"✅ Extracted {len(club_data.clubs)} clubs → saved to clubs.json and clubs_paragraphs.txt")
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { triggerEmailScraping, triggerWhatsappAnalysis, triggerInstagramScraping } from '../services/api';
+import { triggerEmailScraping, streamWhatsappAnalysis, triggerInstagramScraping } from '../services/api';
 
 // A reusable component for displaying API call results
 const ResultDisplay = ({ title, data }: { title: string, data: any }) => {
@@ -31,6 +31,21 @@ const ScrapingDashboard: React.FC = () => {
         }
     };
 
+    // Streams per-club metrics so results appear as each chat finishes
+    const handleWhatsappStream = async () => {
+        setData(prev => ({ ...prev, whatsapp: [] }));
+        await handleApiCall('whatsapp', async () => {
+            const rows: any[] = [];
+            await streamWhatsappAnalysis((event) => {
+                if (event.event === 'club') {
+                    rows.push(event.data);
+                    setData(prev => ({ ...prev, whatsapp: [...rows] }));
+                }
+            });
+            return [...rows].sort((a, b) => b.CEI - a.CEI);
+        });
+    };
+
     return (
         <div className="card">
             <div className="card-header">
@@ -39,7 +54,7 @@ const ScrapingDashboard: React.FC = () => {
             <div className="card-body">
                 {/* WhatsApp */}
                 <div className="mb-3">
-                    <button className="btn btn-primary w-100" onClick={() => handleApiCall('whatsapp', triggerWhatsappAnalysis)} disabled={isLoading['whatsapp']}>
+                    <button className="btn btn-primary w-100" onClick={handleWhatsappStream} disabled={isLoading['whatsapp']}>
                         {isLoading['whatsapp'] ? 'Analyzing...' : 'Analyze WhatsApp Chats'}
                     </button>
                     {error['whatsapp'] && <div className="alert alert-danger mt-2">{error['whatsapp']}</div >}
@@ -20,9 +20,36 @@ async function apiFetch(endpoint: string, options: RequestInit = {}) {
     }
 }
 
+// Reads an NDJSON streaming response, invoking onEvent for each line as it arrives
+async function apiStream(endpoint: string, options: RequestInit, onEvent: (event: any) => void) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    const response = await fetch(`${API_BASE_URL}${endpoint}${separator}stream=ndjson`, options);
+    if (!response.ok || !response.body) {
+        const errorData = await response.json().catch(() => ({ detail: 'An unknown error occurred with the API request.' }));
+        throw new Error(errorData.detail || 'API request failed');
+    }
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+            if (event.event === 'error') throw new Error(event.detail);
+            onEvent(event);
+        }
+    }
+}
+
 // --- Scraping Endpoint Calls ---
 export const triggerEmailScraping = () => apiFetch('/scraping/emails', { method: 'POST' });
 export const triggerWhatsappAnalysis = () => apiFetch('/scraping/whatsapp', { method: 'POST' });
+export const streamWhatsappAnalysis = (onEvent: (event: any) => void) => apiStream('/scraping/whatsapp', { method: 'POST' }, onEvent);
 export const triggerInstagramScraping = (username: string) => apiFetch(`/scraping/instagram/${username}`, { method: 'POST' });
 
 // --- Clustering Endpoint Call ---